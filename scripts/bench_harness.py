@@ -10,55 +10,535 @@ Orchestrates llama.cpp benchmarks with:
 """
 
 import argparse
+import functools
+import glob
 import hashlib
 import json
+import mmap
+import operator
 import os
 import re
+import struct
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
+import numpy as np
 import yaml
 from tabulate import tabulate
 
+try:
+    import orjson  # Optional: much faster serialization of large results
+except ImportError:
+    orjson = None
+
+# Binary identity hash - not a signature, so favour speed over SHA-256
+HASH_ALGO = 'blake2b'
+
+# llama-bench's own repetition count when -r is not given
+LLAMA_BENCH_DEFAULT_REPS = 5
+
+# Files at least this large are hashed via mmap instead of chunked reads
+MMAP_HASH_THRESHOLD = 1 << 20
+
+# Fields reported from /proc/cpuinfo, matched in one pass
+_CPUINFO_RE = re.compile(r'^(model name|physical id|cpu cores)\s*:\s*(.+)$', re.M)
+
+# BLAS/threading libraries worth reporting from the link map
+_BLAS_LIB_RE = re.compile(r'blis|openblas|mkl|gomp|iomp', re.IGNORECASE)
+
+# NUMA node directories under /sys/devices/system/node
+_NODE_DIR_RE = re.compile(r'node\d+$')
+
+# Built-in pinning strategies, in the order they are added to the matrix
+AUTO_PINNING_STRATEGIES = ('local', 'dedicated', 'interleave', 'cross')
+
+# CPU list argument of numactl --physcpubind / -C
+_PHYSCPUBIND_RE = re.compile(r'(?<!\S)(--physcpubind|-C)([= ]?)(\S+)')
+
+# Absolute CPU ids only - no cpuset-relative '+', inverted '!' or 'all'
+_PLAIN_CPULIST_RE = re.compile(r'\d+(-\d+)?(,\d+(-\d+)?)*')
+
+# ELF program header / dynamic tags used to read DT_NEEDED
+_PT_LOAD, _PT_DYNAMIC = 1, 2
+_DT_NULL, _DT_NEEDED, _DT_STRTAB, _DT_STRSZ, _DT_RPATH, _DT_RUNPATH = 0, 1, 5, 10, 15, 29
+
+# Separator between objects in llama-bench's JSON array
+_JSON_SEP_RE = re.compile(r'\s*,\s*')
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_bench_json(output: str) -> List[Dict[str, Any]]:
+    """Decode llama-bench result objects from stdout in one pass.
+    
+    Starts at the first '{' after the opening '[' (or the first '{' if the
+    output is a standalone object), so banner text printed between '[' and
+    '{' is skipped. raw_decode parses each object in C and reports where it
+    ended, so brackets inside strings never confuse the extraction.
+    """
+    results = []
+    pos = output.find('{', output.find('[') + 1)
+    while pos != -1:
+        obj, end = _JSON_DECODER.raw_decode(output, pos)
+        results.append(obj)
+        
+        # Another element only if a ',' separator is followed by '{'
+        sep = _JSON_SEP_RE.match(output, end)
+        if not sep or not output.startswith('{', sep.end()):
+            break
+        pos = sep.end()
+    return results
+
+
+def _read_small(path: str) -> str:
+    """Read a small procfs/sysfs file with raw os.open/os.read.
+    
+    sysfs attributes are at most one page, so a single read returns the
+    whole value without the buffered TextIOWrapper setup of open().
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 4096).decode().strip()
+    finally:
+        os.close(fd)
+
+
+def _sysfs_physical_cores() -> int:
+    """Count physical cores as unique (package, core) pairs from sysfs topology.
+    
+    Returns 0 if topology is unavailable (e.g. containers without /sys).
+    """
+    cores = set()
+    for topo in glob.glob('/sys/devices/system/cpu/cpu[0-9]*/topology'):
+        try:
+            package_id = _read_small(os.path.join(topo, 'physical_package_id'))
+            core_id = _read_small(os.path.join(topo, 'core_id'))
+        except OSError:
+            continue
+        cores.add((package_id, core_id))
+    return len(cores)
+
+
+def _format_cpulist(cpus) -> str:
+    """Format CPU ids as a sysfs-style cpulist, e.g. {0, 1, 2, 5} -> '0-2,5'."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def _parse_cpulist(cpulist: str) -> List[int]:
+    """Expand a cpulist such as '0-3,8,10-11' into CPU ids ('' -> [])."""
+    cpus = []
+    for part in filter(None, cpulist.strip().split(',')):
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def _exclude_cpu(numactl_args: str, cpu: int) -> str:
+    """Remove one CPU from the --physcpubind/-C list in numactl arguments.
+    
+    Lists that aren't plain absolute ids (e.g. 'all', '+0-3', '!0') are left as-is.
+    """
+    def rewrite(match: re.Match) -> str:
+        if not _PLAIN_CPULIST_RE.fullmatch(match.group(3)):
+            return match.group(0)
+        remaining = set(_parse_cpulist(match.group(3))) - {cpu}
+        if not remaining:
+            return match.group(0)
+        return f"{match.group(1)}{match.group(2)}{_format_cpulist(remaining)}"
+    
+    return _PHYSCPUBIND_RE.sub(rewrite, numactl_args)
+
+
+def _elf_arch(path: str) -> Optional[Tuple[int, int]]:
+    """(EI_CLASS, e_machine) of an ELF file, or None if it isn't ELF."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(20)
+    except OSError:
+        return None
+    if len(header) < 20 or header[:4] != b'\x7fELF':
+        return None
+    endian = '<' if header[5] == 1 else '>'
+    return header[4], struct.unpack_from(endian + 'H', header, 18)[0]
+
+
+def _elf_dynamic(path: str) -> Tuple[List[str], List[str], List[str], Tuple[int, int]]:
+    """Read (DT_NEEDED names, DT_RPATH dirs, DT_RUNPATH dirs, arch) from an ELF file.
+    
+    arch is (EI_CLASS, e_machine), used to reject libraries built for another
+    ABI (e.g. i386 multiarch dirs when resolving for x86_64). Raises
+    ValueError if the file is not ELF. Static binaries have no names or dirs.
+    """
+    with open(path, 'rb') as f:
+        ident = f.read(16)
+        if len(ident) < 16 or ident[:4] != b'\x7fELF':
+            raise ValueError(f"{path} is not an ELF file")
+        endian = '<' if ident[5] == 1 else '>'
+        if ident[4] == 2:
+            # ELF64: p_type, p_flags, p_offset, p_vaddr, p_paddr, p_filesz, ...
+            header = struct.unpack(endian + 'HHIQQQIHHHHHH', f.read(48))
+            ph_fmt, ph_fields = endian + 'IIQQQQQQ', (0, 2, 3, 5)
+            dyn_fmt = endian + 'qQ'
+        else:
+            # ELF32: p_type, p_offset, p_vaddr, p_paddr, p_filesz, ...
+            header = struct.unpack(endian + 'HHIIIIIHHHHHH', f.read(36))
+            ph_fmt, ph_fields = endian + 'IIIIIIII', (0, 1, 2, 4)
+            dyn_fmt = endian + 'iI'
+        arch = (ident[4], header[1])
+        phoff, phentsize, phnum = header[4], header[8], header[9]
+        
+        # Program headers: PT_LOAD segments map vaddrs to file offsets
+        loads = []
+        dynamic = None
+        f.seek(phoff)
+        ph_data = f.read(phentsize * phnum)
+        for i in range(phnum):
+            fields = struct.unpack_from(ph_fmt, ph_data, i * phentsize)
+            p_type, p_offset, p_vaddr, p_filesz = (fields[j] for j in ph_fields)
+            if p_type == _PT_LOAD:
+                loads.append((p_vaddr, p_offset, p_filesz))
+            elif p_type == _PT_DYNAMIC:
+                dynamic = (p_offset, p_filesz)
+        if dynamic is None:
+            return [], [], [], arch
+        
+        # Dynamic section: collect string-table offsets until DT_NULL
+        f.seek(dynamic[0])
+        dyn_data = f.read(dynamic[1])
+        needed, rpaths, runpaths = [], [], []
+        strtab = strsz = None
+        dyn_size = struct.calcsize(dyn_fmt)
+        for entry in range(0, len(dyn_data) - dyn_size + 1, dyn_size):
+            tag, val = struct.unpack_from(dyn_fmt, dyn_data, entry)
+            if tag == _DT_NULL:
+                break
+            if tag == _DT_NEEDED:
+                needed.append(val)
+            elif tag == _DT_RPATH:
+                rpaths.append(val)
+            elif tag == _DT_RUNPATH:
+                runpaths.append(val)
+            elif tag == _DT_STRTAB:
+                strtab = val
+            elif tag == _DT_STRSZ:
+                strsz = val
+        if strtab is None or strsz is None:
+            return [], [], [], arch
+        
+        strtab_offset = next(
+            (off + strtab - vaddr for vaddr, off, size in loads if vaddr <= strtab < vaddr + size),
+            None
+        )
+        if strtab_offset is None:
+            raise ValueError(f"{path}: DT_STRTAB outside loadable segments")
+        f.seek(strtab_offset)
+        strings = f.read(strsz)
+    
+    def string_at(offset: int) -> str:
+        return strings[offset:strings.index(b'\0', offset)].decode(errors='replace')
+    
+    def dirs(offsets: List[int]) -> List[str]:
+        return [d for off in offsets for d in string_at(off).split(':') if d]
+    
+    return [string_at(n) for n in needed], dirs(rpaths), dirs(runpaths), arch
+
+
+def _ld_so_conf_dirs(conf: str = '/etc/ld.so.conf') -> List[str]:
+    """Library directories listed in ld.so.conf, following include lines."""
+    dirs = []
+    try:
+        with open(conf) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return dirs
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if line.startswith('include '):
+            pattern = os.path.join(os.path.dirname(conf), line.split(None, 1)[1])
+            for included in sorted(glob.glob(pattern)):
+                dirs.extend(_ld_so_conf_dirs(included))
+        elif line:
+            dirs.append(line)
+    return dirs
+
+
+def _resolve_linked_libs(path: str) -> List[str]:
+    """List shared libraries a binary loads, in ldd's 'name => path' format.
+    
+    Walks DT_NEEDED transitively in the dynamic loader's search order
+    ($ORIGIN expanded per object), without executing the binary as ldd does:
+    
+    1. DT_RPATH of the object, then of the objects that loaded it -
+       only while the object has no DT_RUNPATH
+    2. LD_LIBRARY_PATH
+    3. DT_RUNPATH of the object itself (not inherited)
+    4. ld.so.conf dirs (standing in for ld.so.cache), then the default dirs
+    
+    Candidates whose ELF class/machine differ from the requesting object's
+    are skipped, as the loader does.
+    """
+    ld_library_path = [d for d in os.environ.get('LD_LIBRARY_PATH', '').split(':') if d]
+    system_dirs = _ld_so_conf_dirs() + ['/lib64', '/usr/lib64', '/lib', '/usr/lib']
+    lines = []
+    seen = set()
+    # (object path, expanded DT_RPATH dirs inherited from its loaders)
+    queue = [(path, [])]
+    while queue:
+        current, inherited_rpath = queue.pop(0)
+        needed, rpath, runpath, arch = _elf_dynamic(current)
+        origin = os.path.dirname(os.path.realpath(current))
+        
+        def expand(dirs: List[str]) -> List[str]:
+            return [d.replace('${ORIGIN}', origin).replace('$ORIGIN', origin) for d in dirs]
+        
+        if runpath:
+            loader_rpath = []
+            dirs = ld_library_path + expand(runpath) + system_dirs
+        else:
+            loader_rpath = expand(rpath) + inherited_rpath
+            dirs = loader_rpath + ld_library_path + system_dirs
+        
+        for lib in needed:
+            if lib in seen:
+                continue
+            seen.add(lib)
+            candidates = [lib] if '/' in lib else [os.path.join(d, lib) for d in dirs]
+            resolved = next(
+                (c for c in candidates if os.path.isfile(c) and _elf_arch(c) == arch),
+                None
+            )
+            lines.append(f"{lib} => {resolved or 'not found'}")
+            if resolved:
+                queue.append((resolved, loader_rpath))
+    return lines
+
+
+def _physical_cpus(cpus: List[int]) -> List[int]:
+    """Keep one hardware thread (the lowest id) per physical core."""
+    physical = []
+    for cpu in cpus:
+        try:
+            siblings = _read_small(f'/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list')
+            if cpu == min(_parse_cpulist(siblings)):
+                physical.append(cpu)
+        except (OSError, ValueError):
+            physical.append(cpu)
+    return physical
+
+
+def _auto_pinning_configs(
+    strategies: List[str],
+    reserved_cores: int = 4,
+    exclude_cpu: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Build test_matrix entries for built-in NUMA pinning strategies.
+    
+    Node CPU lists come from /sys/devices/system/node, restricted to one
+    thread per physical core. Strategies are emitted in locality order,
+    regardless of the order they are listed in:
+    
+    - local:      node 0 cores, memory bound to node 0 (first-touch stays local)
+    - dedicated:  all cores except housekeeping ones (kernel isolcpus if set,
+                  otherwise the first `reserved_cores`), local allocation
+    - interleave: all cores, pages interleaved across every node
+    - cross:      node 0 cores, memory bound to the last node with CPUs
+                  (remote-socket baseline; memory-only CXL/HBM nodes are a
+                  different tier and are not picked)
+    
+    Strict pinning is not automatically faster: binding memory to a remote
+    node, or packing more threads than a node has cores, can run 2-4x
+    slower than leaving placement to the kernel. Compare these against an
+    unpinned entry rather than assuming the strictest one wins.
+    
+    `exclude_cpu` (the orchestrator's core) is left out of every row before
+    -t/OMP_NUM_THREADS are derived, so thread counts match the cores used.
+    """
+    node_root = '/sys/devices/system/node'
+    try:
+        node_names = os.listdir(node_root)
+    except OSError:
+        node_names = []
+    nodes = {}
+    for name in node_names:
+        if _NODE_DIR_RE.match(name):
+            nodes[int(name[4:])] = _physical_cpus(
+                _parse_cpulist(_read_small(os.path.join(node_root, name, 'cpulist')))
+            )
+    # Memory-only nodes (CXL/HBM, or all CPUs offline) have an empty cpulist
+    nodes = {node: cpus for node, cpus in sorted(nodes.items()) if cpus}
+    if not nodes:
+        raise ValueError("auto_pinning_strategies: no NUMA nodes with CPUs found in sysfs")
+    first_node, last_node = min(nodes), max(nodes)
+    all_cpus = sorted(cpu for cpus in nodes.values() for cpu in cpus)
+    
+    def entry(name: str, numactl: str, cpus: List[int]) -> Dict[str, Any]:
+        cpus = [cpu for cpu in cpus if cpu != exclude_cpu] or cpus
+        return {
+            'name': f"auto_{name}",
+            'numactl': f"{numactl} --physcpubind={_format_cpulist(cpus)}",
+            'env': {'OMP_NUM_THREADS': str(len(cpus))},
+            'extra_args': f"-t {len(cpus)}"
+        }
+    
+    unknown = set(strategies) - set(AUTO_PINNING_STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown auto_pinning_strategies: {sorted(unknown)}")
+    
+    configs = []
+    for strategy in AUTO_PINNING_STRATEGIES:
+        if strategy not in strategies:
+            continue
+        if strategy == 'local':
+            configs.append(entry(f"local_node{first_node}", f"--membind={first_node}", nodes[first_node]))
+        elif strategy == 'dedicated':
+            try:
+                isolated = set(_parse_cpulist(_read_small('/sys/devices/system/cpu/isolated')))
+            except (OSError, ValueError):
+                isolated = set()
+            if isolated:
+                cpus = [cpu for cpu in all_cpus if cpu in isolated]
+            else:
+                cpus = all_cpus[reserved_cores:]
+            if not cpus:
+                print(f"⚠️  auto_pinning_strategies: no cores left for 'dedicated', skipping")
+                continue
+            configs.append(entry('dedicated', '--localalloc', cpus))
+        elif strategy == 'interleave':
+            configs.append(entry('interleave', '--interleave=all', all_cpus))
+        elif strategy == 'cross':
+            if first_node == last_node:
+                print(f"⚠️  auto_pinning_strategies: 'cross' needs 2+ NUMA nodes with CPUs, skipping")
+                continue
+            configs.append(entry(f"cross_node{first_node}_mem{last_node}", f"--membind={last_node}", nodes[first_node]))
+    return configs
+
+
+def _dumps_json(obj: Any) -> str:
+    """Serialize obj as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _dump_json(obj: Any, path: Path):
+    """Write obj as indented JSON, using orjson when it is installed."""
+    path.write_text(_dumps_json(obj))
+
+
+def _repair_results_json(path: Path) -> int:
+    """Re-terminate a streamed results.json left open by a hard kill.
+    
+    Keeps every complete record, drops one cut off mid-write, and rewrites
+    the file as a closed array (via rename, so a crash here loses nothing).
+    Returns the number of records kept.
+    """
+    text = path.read_text()
+    pos = text.find('[')
+    if pos < 0:
+        raise ValueError(f"{path} does not contain a results array")
+    pos += 1
+    
+    records = []
+    while True:
+        while pos < len(text) and text[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(text) or text[pos] == ']':
+            break
+        try:
+            record, pos = _JSON_DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break  # truncated final record
+        records.append(record)
+    
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    _dump_json(records, tmp_path)
+    os.replace(tmp_path, path)
+    return len(records)
+
 
 class ProvenanceCollector:
     """Captures system state and binary fingerprints."""
     
     @staticmethod
-    def binary_sha256(path: str) -> str:
-        """Compute SHA256 of binary."""
-        sha256 = hashlib.sha256()
+    def binary_fingerprint(path: str) -> Dict[str, str]:
+        """Fingerprint binary with BLAKE2b (mmap'd in one update when large)."""
+        hasher = hashlib.new(HASH_ALGO, digest_size=32)
         with open(path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+            if os.fstat(f.fileno()).st_size >= MMAP_HASH_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    hasher.update(mm)
+            else:
+                for chunk in iter(lambda: f.read(8192), b''):
+                    hasher.update(chunk)
+        return {
+            'algo': HASH_ALGO,
+            'digest': hasher.hexdigest()
+        }
     
     @staticmethod
     def linked_blas(path: str) -> List[str]:
-        """Extract BLAS/threading libraries from ldd output."""
+        """Extract BLAS/threading libraries from the binary's link map.
+        
+        Parses the ELF dynamic section directly; ldd is only a fallback since
+        it runs the dynamic linker on the binary.
+        """
         try:
-            result = subprocess.run(
-                ['ldd', path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            libs = []
-            patterns = ['blis', 'openblas', 'mkl', 'gomp', 'iomp']
-            for line in result.stdout.splitlines():
-                if any(p in line.lower() for p in patterns):
-                    libs.append(line.strip())
-            return libs
-        except Exception as e:
-            return [f"Error getting ldd: {e}"]
+            libs = _resolve_linked_libs(path)
+        except (OSError, ValueError, struct.error):
+            try:
+                result = subprocess.run(
+                    ['ldd', path],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                libs = result.stdout.splitlines()
+            except Exception as e:
+                return [f"Error getting ldd: {e}"]
+        return [line.strip() for line in libs if _BLAS_LIB_RE.search(line)]
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def numa_status() -> Dict[str, Any]:
-        """Capture NUMA configuration."""
+        """Capture NUMA topology from sysfs (numactl --show as fallback)."""
+        node_root = '/sys/devices/system/node'
+        try:
+            nodes = {}
+            node_names = [n for n in os.listdir(node_root) if _NODE_DIR_RE.match(n)]
+            for name in sorted(node_names, key=lambda n: int(n[4:])):
+                cpus = _read_small(os.path.join(node_root, name, 'cpulist'))
+                with open(os.path.join(node_root, name, 'meminfo')) as f:
+                    # "Node 0 MemTotal:       65856148 kB"
+                    mem_total_kb = int(f.readline().split()[-2])
+                nodes[name] = {
+                    'cpus': cpus,
+                    'mem_total_kb': mem_total_kb
+                }
+            if nodes:
+                return {
+                    'available': True,
+                    'nodes': nodes,
+                    'cpu_affinity': _format_cpulist(os.sched_getaffinity(0))
+                }
+        except (OSError, ValueError, IndexError):
+            pass
+        
         try:
             result = subprocess.run(
                 ['numactl', '--show'],
@@ -77,26 +557,40 @@ class ProvenanceCollector:
             }
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def cpu_info() -> Dict[str, str]:
         """Extract CPU model and core count."""
         info = {}
         try:
+            physical_cores = _sysfs_physical_cores()
             with open('/proc/cpuinfo', 'r') as f:
-                content = f.read()
-                model_match = re.search(r'model name\s*:\s*(.+)', content)
-                if model_match:
-                    info['model'] = model_match.group(1).strip()
-                
-                # Count physical cores
-                phys_ids = set(re.findall(r'physical id\s*:\s*(\d+)', content))
-                cores_per_pkg = set(re.findall(r'cpu cores\s*:\s*(\d+)', content))
-                if phys_ids and cores_per_pkg:
-                    info['physical_cores'] = len(phys_ids) * int(list(cores_per_pkg)[0])
+                if physical_cores:
+                    # Topology came from sysfs - only need the first model name
+                    for line in f:
+                        if line.startswith('model name'):
+                            info['model'] = line.split(':', 1)[1].strip()
+                            break
+                    info['physical_cores'] = physical_cores
+                else:
+                    # Single sweep over /proc/cpuinfo for all fields
+                    fields: Dict[str, set] = {}
+                    for match in _CPUINFO_RE.finditer(f.read()):
+                        key, value = match.group(1), match.group(2).strip()
+                        if key == 'model name':
+                            info.setdefault('model', value)
+                        else:
+                            fields.setdefault(key, set()).add(value)
+                    
+                    phys_ids = fields.get('physical id')
+                    cores_per_pkg = fields.get('cpu cores')
+                    if phys_ids and cores_per_pkg:
+                        info['physical_cores'] = len(phys_ids) * int(next(iter(cores_per_pkg)))
         except Exception as e:
             info['error'] = str(e)
         return info
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def kernel_settings() -> Dict[str, str]:
         """Check relevant kernel tunables."""
         settings = {}
@@ -106,44 +600,78 @@ class ProvenanceCollector:
         }
         for name, path in paths.items():
             try:
-                with open(path, 'r') as f:
-                    settings[name] = f.read().strip()
-            except Exception:
+                settings[name] = _read_small(path)
+            except OSError:
                 settings[name] = 'N/A'
         return settings
     
     @classmethod
-    def collect_all(cls, binary_path: str, env: Dict[str, str]) -> Dict[str, Any]:
-        """Gather complete provenance snapshot."""
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'binary': {
-                'path': binary_path,
-                'sha256': cls.binary_sha256(binary_path),
-                'linked_libs': cls.linked_blas(binary_path)
-            },
-            'environment': env,
-            'numa': cls.numa_status(),
-            'cpu': cls.cpu_info(),
-            'kernel': cls.kernel_settings()
+    def system_snapshot(cls, pool: Optional[ThreadPoolExecutor] = None) -> Dict[str, Any]:
+        """NUMA/CPU/kernel state - invariant for the run, cached per process."""
+        collectors = {
+            'numa': cls.numa_status,
+            'cpu': cls.cpu_info,
+            'kernel': cls.kernel_settings
         }
+        if pool is None:
+            return {name: fn() for name, fn in collectors.items()}
+        futures = {name: pool.submit(fn) for name, fn in collectors.items()}
+        return {name: f.result() for name, f in futures.items()}
+    
+    @classmethod
+    def collect_all(cls, binary_path: str, env: Dict[str, str]) -> Dict[str, Any]:
+        """Gather complete provenance snapshot.
+        
+        Sub-collectors are independent and mostly blocked on IO or
+        subprocesses, so they run concurrently. Each keeps its own error
+        fallback, so one failing collector doesn't affect the others.
+        """
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            fingerprint = pool.submit(cls.binary_fingerprint, binary_path)
+            linked_libs = pool.submit(cls.linked_blas, binary_path)
+            system = cls.system_snapshot(pool)
+            
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'binary': {
+                    'path': binary_path,
+                    'fingerprint': fingerprint.result(),
+                    'linked_libs': linked_libs.result()
+                },
+                'environment': env,
+                **system
+            }
 
 
 class BenchmarkRunner:
     """Executes individual benchmark runs with full control."""
     
-    def __init__(self, config: Dict[str, Any], report_dir: Path):
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        report_dir: Path,
+        cpu_affinity: Optional[set] = None
+    ):
         self.config = config
         self.report_dir = report_dir
         self.raw_dir = report_dir / 'raw'
         self.raw_dir.mkdir(parents=True, exist_ok=True)
+        
+        # CPUs the benchmark may use - needed when the orchestrator is pinned,
+        # since children would otherwise inherit its single-core affinity
+        self.cpu_affinity = cpu_affinity
+        
+        # Binaries whose fused output had no usable per-sample data - their
+        # remaining tests go straight to one invocation per rep
+        self.unfusable_binaries: Set[str] = set()
     
     def build_command(
         self,
         binary: str,
         model: str,
         metric_args: str,
-        pinning: Dict[str, Any]
+        pinning: Dict[str, Any],
+        bench_reps: Optional[int] = None
     ) -> Tuple[List[str], Dict[str, str]]:
         """Construct the benchmark command."""
         
@@ -156,7 +684,9 @@ class BenchmarkRunner:
         
         # Add llama-bench internal repetitions if configured
         # Default is 5 in llama-bench, but user can override
-        if 'llama_bench_reps' in self.config:
+        if bench_reps is not None:
+            cmd_parts.extend(['-r', str(bench_reps)])
+        elif 'llama_bench_reps' in self.config:
             cmd_parts.extend(['-r', str(self.config['llama_bench_reps'])])
         
         # NUMA handling
@@ -170,16 +700,16 @@ class BenchmarkRunner:
         
         return cmd_parts, env
     
-    def run_single(
+    def _prepare(
         self,
         build: Dict[str, Any],
         pinning: Dict[str, Any],
         metric: Dict[str, str],
-        rep: int,
         extra_env: Optional[Dict[str, str]] = None,
-        extra_args: str = ''
-    ) -> Optional[Dict[str, Any]]:
-        """Execute a single benchmark iteration."""
+        extra_args: str = '',
+        bench_reps: Optional[int] = None
+    ) -> Tuple[List[str], Dict[str, str]]:
+        """Build the full command and environment for one invocation."""
         
         # Get model path - handle both 'model.path' and 'model_path'
         if 'model' in self.config and isinstance(self.config['model'], dict):
@@ -191,7 +721,8 @@ class BenchmarkRunner:
             build.get('binary') or build.get('path', ''),
             model_path,
             metric['args'],
-            pinning
+            pinning,
+            bench_reps=bench_reps
         )
         
         # Add extra args if provided (e.g., -t 16)
@@ -206,16 +737,24 @@ class BenchmarkRunner:
         if 'env' in build:
             env.update(build['env'])
         
-        print(f"  Rep {rep}: {' '.join(cmd)}")
-        
+        return cmd, env
+    
+    def _execute(
+        self,
+        cmd: List[str],
+        env: Dict[str, str],
+        timeout: int
+    ) -> Optional[Tuple[subprocess.CompletedProcess, float]]:
+        """Run the benchmark process; returns (result, elapsed) on success."""
         try:
             start_time = time.time()
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=300,  # 5 min timeout
-                env=env
+                timeout=timeout,
+                env=env,
+                preexec_fn=self._restore_affinity if self.cpu_affinity else None
             )
             elapsed = time.time() - start_time
             
@@ -224,21 +763,7 @@ class BenchmarkRunner:
                 print(f"    stderr: {result.stderr[:200]}")
                 return None
             
-            # Parse output (llama-bench produces specific format)
-            perf = self.parse_bench_output(result.stdout)
-            if not perf:
-                print(f"    ⚠️  Could not parse output")
-                return None
-            
-            print(f"    ✓ {perf.get('tokens_per_sec', 'N/A')} t/s")
-            
-            return {
-                'success': True,
-                'elapsed': elapsed,
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'performance': perf
-            }
+            return result, elapsed
             
         except subprocess.TimeoutExpired:
             print(f"    ⏱️  Timeout")
@@ -247,80 +772,242 @@ class BenchmarkRunner:
             print(f"    ❌ Exception: {e}")
             return None
     
+    def _run_record(
+        self,
+        result: subprocess.CompletedProcess,
+        elapsed: float,
+        perf: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Assemble the stored record for one repetition."""
+        run_result = {
+            'success': True,
+            'elapsed': elapsed,
+            'performance': perf
+        }
+        
+        # Raw output is only needed for debugging - stdout can be MBs and
+        # stderr carries the full model-load log, in every result record
+        if self.config.get('keep_raw_stdout', False):
+            run_result['stdout'] = result.stdout
+            run_result['stderr'] = result.stderr
+        
+        return run_result
+    
+    def run_single(
+        self,
+        build: Dict[str, Any],
+        pinning: Dict[str, Any],
+        metric: Dict[str, str],
+        rep: int,
+        extra_env: Optional[Dict[str, str]] = None,
+        extra_args: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """Execute a single benchmark iteration."""
+        cmd, env = self._prepare(build, pinning, metric, extra_env, extra_args)
+        
+        print(f"  Rep {rep}: {' '.join(cmd)}")
+        
+        executed = self._execute(cmd, env, timeout=300)  # 5 min timeout
+        if not executed:
+            return None
+        result, elapsed = executed
+        
+        # Parse output (llama-bench produces specific format)
+        perf = self.parse_bench_output(result.stdout)
+        if not perf:
+            print(f"    ⚠️  Could not parse output")
+            return None
+        
+        print(f"    ✓ {perf.get('tokens_per_sec', 'N/A')} t/s")
+        
+        return self._run_record(result, elapsed, perf)
+    
+    def run_separately(
+        self,
+        build: Dict[str, Any],
+        pinning: Dict[str, Any],
+        metric: Dict[str, str],
+        reps: int,
+        extra_env: Optional[Dict[str, str]] = None,
+        extra_args: str = '',
+        first_rep: int = 1
+    ) -> List[Dict[str, Any]]:
+        """Run reps first_rep..reps as independent invocations, keeping successes."""
+        run_results = []
+        for rep in range(first_rep, reps + 1):
+            result = self.run_single(build, pinning, metric, rep, extra_env, extra_args)
+            if result:
+                run_results.append(result)
+        return run_results
+    
+    def can_fuse(self, build: Dict[str, Any]) -> bool:
+        """False once a fused run of this build's binary lacked per-sample data."""
+        return (build.get('binary') or build.get('path', '')) not in self.unfusable_binaries
+    
+    def run_fused(
+        self,
+        build: Dict[str, Any],
+        pinning: Dict[str, Any],
+        metric: Dict[str, str],
+        reps: int,
+        extra_env: Optional[Dict[str, str]] = None,
+        extra_args: str = ''
+    ) -> List[Dict[str, Any]]:
+        """Execute all our repetitions in one llama-bench invocation.
+        
+        The model is loaded once and llama-bench runs reps × llama_bench_reps
+        samples; these are split back into `reps` chunks, each reported like
+        a separate run. If the output has no usable per-sample data, the
+        fused average is kept as rep 1, the remaining reps run separately,
+        and the binary is marked unfusable for the rest of the run.
+        """
+        inner_reps = self.config.get('llama_bench_reps', LLAMA_BENCH_DEFAULT_REPS)
+        cmd, env = self._prepare(
+            build, pinning, metric, extra_env, extra_args,
+            bench_reps=reps * inner_reps
+        )
+        
+        print(f"  Reps 1-{reps} (fused): {' '.join(cmd)}")
+        
+        executed = self._execute(cmd, env, timeout=300 * reps)
+        if not executed:
+            return []
+        result, elapsed = executed
+        
+        perfs = self.parse_fused_output(result.stdout, reps)
+        if not perfs:
+            print(f"    ⚠️  No per-sample data in output - not fusing this build again")
+            self.unfusable_binaries.add(build.get('binary') or build.get('path', ''))
+            
+            # The invocation itself succeeded: keep its overall average
+            # rather than paying for all reps a second time
+            run_results = []
+            perf = self.parse_bench_output(result.stdout)
+            if perf:
+                print(f"    ✓ Rep 1: {perf.get('tokens_per_sec', 'N/A')} t/s")
+                run_result = self._run_record(result, elapsed, perf)
+                run_result['bench_reps'] = reps * inner_reps
+                run_results.append(run_result)
+            first_rep = len(run_results) + 1
+            return run_results + self.run_separately(
+                build, pinning, metric, reps, extra_env, extra_args, first_rep=first_rep
+            )
+        
+        # The invocation's elapsed time and raw output are stored once, on
+        # the first chunk; the others only carry their own performance
+        run_results = []
+        for rep, perf in enumerate(perfs, 1):
+            print(f"    ✓ Rep {rep}: {perf.get('tokens_per_sec', 'N/A')} t/s")
+            if rep == 1:
+                run_result = self._run_record(result, elapsed, perf)
+            else:
+                run_result = {'success': True, 'performance': perf}
+            run_result['fused_reps'] = reps
+            run_results.append(run_result)
+        return run_results
+    
+    def _restore_affinity(self):
+        """Runs in the forked child before exec: widen affinity for the benchmark."""
+        os.sched_setaffinity(0, self.cpu_affinity)
+    
     @staticmethod
-    def parse_bench_output(output: str) -> Optional[Dict[str, float]]:
-        """Extract performance metrics from llama-bench JSON output.
+    def _select_result(output: str) -> Optional[Dict[str, Any]]:
+        """Pick the llama-bench result object out of raw stdout.
         
-        Handles IK llama.cpp fork's banner pollution which appears as:
+        Jumps straight to the last "avg_ts" key (present in every successful
+        result) and decodes only its enclosing object, so banners and logs
+        elsewhere in stdout are never scanned. That includes the IK
+        llama.cpp fork's banner pollution, which appears as:
         [
         ======================================= HAVE_FANCY_SIMD is NOT defined
           {
             ...
           }
         ]
+        The last result is the one wanted: with -pg, llama-bench also runs
+        its default -p/-n tests first and the combined test comes last.
         """
+        sentinel = output.rfind('"avg_ts"')
+        if sentinel == -1:
+            return None
+        
+        start = output.rfind('{', 0, sentinel)
+        if start != -1:
+            try:
+                result, _ = _JSON_DECODER.raw_decode(output, start)
+                if isinstance(result, dict) and 'avg_ts' in result:
+                    return result
+            except ValueError:
+                pass
+        
+        # A '{' inside a string value misled the fast path - decode everything
+        results = _decode_bench_json(output)
+        return results[-1] if results else None
+    
+    @staticmethod
+    def _perf_from_result(result: Dict[str, Any]) -> Dict[str, float]:
+        """Map a llama-bench result object to our performance dict."""
+        perf = {}
+        
+        # Extract throughput (tokens per second)
+        if 'avg_ts' in result:
+            perf['tokens_per_sec'] = result['avg_ts']
+        
+        # Extract test type info
+        test_type = result.get('test', '')
+        if 'pp' in test_type:
+            perf['pp_tokens_per_sec'] = result.get('avg_ts', 0)
+        elif 'tg' in test_type:
+            perf['tg_tokens_per_sec'] = result.get('avg_ts', 0)
+        
+        # Store additional useful metrics
+        perf['avg_ns'] = result.get('avg_ns', 0)
+        perf['stddev_ts'] = result.get('stddev_ts', 0)
+        perf['n_prompt'] = result.get('n_prompt', 0)
+        perf['n_gen'] = result.get('n_gen', 0)
+        
+        return perf
+    
+    @classmethod
+    def parse_bench_output(cls, output: str) -> Optional[Dict[str, float]]:
+        """Extract performance metrics from llama-bench JSON output."""
         try:
-            # IK fork prints banner BETWEEN '[' and '{', so we need to clean it out
-            # Strategy: Find '[', then find first '{', then reconstruct as '[ {' + rest
-            
-            bracket_start = output.find('[')
-            if bracket_start == -1:
-                # Try standalone object
-                brace_start = output.find('{')
-                if brace_start != -1:
-                    output = output[brace_start:]
-                else:
-                    return None
-            else:
-                # Found '[', now find the first '{'
-                brace_start = output.find('{', bracket_start)
-                if brace_start == -1:
-                    return None
-                
-                # Find the matching ']' at the end
-                bracket_end = output.rfind(']')
-                if bracket_end == -1:
-                    return None
-                
-                # Reconstruct clean JSON: [ + content from { to ] (inclusive)
-                output = '[' + output[brace_start:bracket_end+1]
-            
-            # Parse the cleaned JSON
-            data = json.loads(output)
-            
-            # Could be a single result or array of results
-            if isinstance(data, list):
-                result = data[0] if data else {}
-            else:
-                result = data
-            
+            result = cls._select_result(output)
             if not result:
                 return None
-            
-            perf = {}
-            
-            # Extract throughput (tokens per second)
-            if 'avg_ts' in result:
-                perf['tokens_per_sec'] = result['avg_ts']
-            
-            # Extract test type info
-            test_type = result.get('test', '')
-            if 'pp' in test_type:
-                perf['pp_tokens_per_sec'] = result.get('avg_ts', 0)
-            elif 'tg' in test_type:
-                perf['tg_tokens_per_sec'] = result.get('avg_ts', 0)
-            
-            # Store additional useful metrics
-            perf['avg_ns'] = result.get('avg_ns', 0)
-            perf['stddev_ts'] = result.get('stddev_ts', 0)
-            perf['n_prompt'] = result.get('n_prompt', 0)
-            perf['n_gen'] = result.get('n_gen', 0)
-            
-            return perf if perf else None
+            return cls._perf_from_result(result)
             
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             # If JSON parsing fails, return None (caller will handle)
             return None
+    
+    @classmethod
+    def parse_fused_output(cls, output: str, reps: int) -> Optional[List[Dict[str, float]]]:
+        """Split a fused run's per-sample data into `reps` performance dicts."""
+        try:
+            result = cls._select_result(output)
+        except ValueError:
+            return None
+        if not result:
+            return None
+        
+        samples_ts = result.get('samples_ts') or []
+        samples_ns = result.get('samples_ns') or []
+        if not samples_ts or len(samples_ts) % reps or len(samples_ns) != len(samples_ts):
+            return None
+        
+        chunk = len(samples_ts) // reps
+        perfs = []
+        for i in range(reps):
+            ts = np.asarray(samples_ts[i * chunk:(i + 1) * chunk], dtype=np.float64)
+            ns = np.asarray(samples_ns[i * chunk:(i + 1) * chunk], dtype=np.float64)
+            perfs.append(cls._perf_from_result({
+                **result,
+                'avg_ts': float(ts.mean()),
+                'stddev_ts': float(ts.std(ddof=1)) if chunk > 1 else 0.0,
+                'avg_ns': int(ns.mean())
+            }))
+        return perfs
 
 
 class BenchmarkOrchestrator:
@@ -332,7 +1019,16 @@ class BenchmarkOrchestrator:
             self.config = yaml.safe_load(f)
         
         self.mode = self.config['mode']
-        self.results = []
+        
+        # Full records are streamed to results.json; only the per-test numbers
+        # needed for summary.md and promote.yaml are kept in memory
+        self.summaries: List[Dict[str, Any]] = []
+        self._test_configs: Optional[List[Dict[str, Any]]] = None
+        
+        # Full provenance snapshots live once in provenance.json; results
+        # only carry the key. (binary, mtime, size, env) -> provenance key
+        self.provenance_index: Dict[str, Dict[str, Any]] = {}
+        self._prov_cache: Dict[tuple, str] = {}
         
         # Setup report directory
         timestamp = datetime.now().strftime('%Y-%m-%d-%H%M%S')
@@ -347,15 +1043,38 @@ class BenchmarkOrchestrator:
             report_base = Path('./reports')  # Default fallback
             
         self.report_dir = report_base / report_name
-        self.report_dir.mkdir(parents=True, exist_ok=True)
+        (self.report_dir / 'raw').mkdir(parents=True, exist_ok=True)
         
-        # Create symlink to latest
+        # raw/results.json is streamed: '[' when run_all starts, one record per
+        # completed test, ']' when the run ends - never re-serialized as a whole
+        self._results_fp = None
+        self._first_record = True
+        
+        # Point 'latest' at this run: symlink under a temp name, then rename
+        # over the old link atomically (safe with concurrent orchestrators,
+        # and replaces dangling links that exists() would miss)
         latest_link = report_base / 'latest'
-        if latest_link.exists():
-            latest_link.unlink()
-        latest_link.symlink_to(report_name)
+        tmp_link = latest_link.with_name(f".latest.{os.getpid()}")
+        os.symlink(report_name, tmp_link)
+        os.replace(tmp_link, latest_link)
         
         print(f"📊 Report directory: {self.report_dir}")
+        
+        # Snapshot machine state once, before any pinning changes our affinity
+        ProvenanceCollector.system_snapshot()
+        
+        # Optionally pin the orchestrator to its own core so it doesn't
+        # contend with the benchmark threads for scheduler time
+        self.orchestrator_core = self.config.get('orchestrator_core')
+        self.bench_cpus = None
+        if self.orchestrator_core is not None:
+            self.bench_cpus = os.sched_getaffinity(0)
+            if self.config.get('auto_exclude_orch_core', False):
+                self.bench_cpus = self.bench_cpus - {self.orchestrator_core}
+                if not self.bench_cpus:
+                    raise ValueError(f"orchestrator_core {self.orchestrator_core} is the only CPU available")
+            os.sched_setaffinity(0, {self.orchestrator_core})
+            print(f"📌 Orchestrator pinned to CPU {self.orchestrator_core}")
     
     def get_selected_builds(self) -> List[Dict[str, Any]]:
         """Filter builds based on selection criteria."""
@@ -380,29 +1099,68 @@ class BenchmarkOrchestrator:
         
         return [b for b in all_builds if b['name'] in selected]
     
-    def generate_test_matrix(self) -> List[Dict[str, Any]]:
-        """Create the full test matrix from test_matrix config section.
+    def get_test_configs(self) -> List[Dict[str, Any]]:
+        """test_matrix entries plus any generated auto_pinning_strategies."""
+        if self._test_configs is None:
+            self._test_configs = list(self.config.get('test_matrix') or [])
+            strategies = self.config.get('auto_pinning_strategies')
+            if strategies:
+                exclude_cpu = None
+                if self.config.get('auto_exclude_orch_core', False):
+                    exclude_cpu = self.orchestrator_core
+                self._test_configs.extend(
+                    _auto_pinning_configs(
+                        strategies,
+                        self.config.get('reserved_cores', 4),
+                        exclude_cpu=exclude_cpu
+                    )
+                )
+        return self._test_configs
+    
+    def iter_test_matrix(self) -> Iterator[Dict[str, Any]]:
+        """Yield the full test matrix lazily, one test case at a time.
         
         For 'exploratory' mode: simple matrix of builds × configs × metrics
         For 'deep' mode: parameter sweep with KV cache, MLA, batch variations
         """
         if self.mode == 'deep':
-            return self._generate_deep_matrix()
+            return self._iter_deep_matrix()
         else:
-            return self._generate_exploratory_matrix()
+            return self._iter_exploratory_matrix()
     
-    def _generate_exploratory_matrix(self) -> List[Dict[str, Any]]:
-        """Generate exploratory test matrix (simple combinations)."""
-        matrix = []
-        builds = self.get_selected_builds()
-        
-        if 'test_matrix' not in self.config:
-            raise ValueError("Config must have 'test_matrix' section")
+    def count_test_matrix(self) -> int:
+        """Number of test cases iter_test_matrix() yields, without building them."""
+        count = len(self.get_selected_builds()) * len(self._checked_test_configs()) * len(self._parse_metrics())
+        if self.mode == 'deep':
+            for variants in self._sweep_variants():
+                count *= len(variants)
+        return count
+    
+    def _build_pinning(self, test_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract pinning options from a test_matrix entry.
         
-        test_configs = self.config['test_matrix']
+        With auto_exclude_orch_core, the orchestrator's core is dropped from
+        any --physcpubind/-C list so benchmark threads never share it.
+        """
+        numactl = test_config.get('numactl')
+        if numactl and self.orchestrator_core is not None and self.config.get('auto_exclude_orch_core', False):
+            numactl = _exclude_cpu(numactl, self.orchestrator_core)
+        return {
+            'numactl': numactl,
+            'llama_numa': test_config.get('llama_numa')
+        }
+    
+    def _checked_test_configs(self) -> List[Dict[str, Any]]:
+        """get_test_configs(), requiring at least one entry."""
+        test_configs = self.get_test_configs()
+        if not test_configs:
+            raise ValueError("Config must have 'test_matrix' or 'auto_pinning_strategies' section")
+        return test_configs
+    
+    def _parse_metrics(self) -> List[Dict[str, str]]:
+        """Parse metrics into dict format if they're strings."""
         metrics = self.config.get('metrics', ['pp512', 'tg128', 'mixed'])
         
-        # Parse metrics into dict format if they're strings
         parsed_metrics = []
         for m in metrics:
             if isinstance(m, str):
@@ -416,73 +1174,62 @@ class BenchmarkOrchestrator:
                     parsed_metrics.append({'name': 'mixed', 'args': '-pg 512,128'})
             else:
                 parsed_metrics.append(m)
+        return parsed_metrics
+    
+    def _sweep_variants(self) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], List[Dict[str, str]]]:
+        """Deep-mode (kv_cache, mla_variants, batch_sizes) lists with defaults."""
+        # Get parameter sweep config
+        param_sweep = self.config.get('parameter_sweep', {})
+        
+        # KV cache variations (default: just f16/f16)
+        kv_variants = param_sweep.get('kv_cache', [{'name': 'f16_f16', 'args': '-ctk f16 -ctv f16'}])
+        
+        # MLA/attention variants (default: none)
+        mla_variants = param_sweep.get('mla_variants', [{'name': 'baseline', 'args': ''}])
+        
+        # Batch size variants (default: standard)
+        batch_variants = param_sweep.get('batch_sizes', [{'name': 'standard', 'args': '-b 2048 -ub 512'}])
+        
+        return kv_variants, mla_variants, batch_variants
+    
+    def _iter_exploratory_matrix(self) -> Iterator[Dict[str, Any]]:
+        """Generate exploratory test matrix (simple combinations)."""
+        builds = self.get_selected_builds()
+        test_configs = self._checked_test_configs()
+        parsed_metrics = self._parse_metrics()
         
         for build in builds:
             for test_config in test_configs:
                 # Convert test_config to pinning format
-                pinning = {
-                    'numactl': test_config.get('numactl'),
-                    'llama_numa': test_config.get('llama_numa')
-                }
+                pinning = self._build_pinning(test_config)
                 
                 for metric in parsed_metrics:
-                    test_case = {
+                    yield {
                         'build': build,
                         'pinning': (test_config['name'], pinning),
                         'metric': metric,
                         'env': test_config.get('env', {}),
                         'extra_args': test_config.get('extra_args', '')
                     }
-                    matrix.append(test_case)
-        
-        return matrix
     
-    def _generate_deep_matrix(self) -> List[Dict[str, Any]]:
+    def _iter_deep_matrix(self) -> Iterator[Dict[str, Any]]:
         """Generate deep test matrix with parameter sweeps.
         
         Deep mode explores parameter variations:
         - KV cache types (f16/f16, f16/f8, f8/f16, f8/f8)
         - MLA variants (-mla 2/3, -fa, -fmoe combinations)
         - Batch/ubatch sizes
-        - NUMA configs (from test_matrix)
+        - NUMA configs (from test_matrix and auto_pinning_strategies)
         """
-        matrix = []
         builds = self.get_selected_builds()
-        test_configs = self.config['test_matrix']
-        metrics = self.config.get('metrics', ['pp512', 'tg128', 'mixed'])
-        
-        # Parse metrics
-        parsed_metrics = []
-        for m in metrics:
-            if isinstance(m, str):
-                if m == 'pp512':
-                    parsed_metrics.append({'name': 'pp512', 'args': '-p 512 -n 0'})
-                elif m == 'tg128':
-                    parsed_metrics.append({'name': 'tg128', 'args': '-p 0 -n 128'})
-                elif m == 'mixed':
-                    parsed_metrics.append({'name': 'mixed', 'args': '-pg 512,128'})
-            else:
-                parsed_metrics.append(m)
-        
-        # Get parameter sweep config
-        param_sweep = self.config.get('parameter_sweep', {})
-        
-        # KV cache variations (default: just f16/f16)
-        kv_variants = param_sweep.get('kv_cache', [{'name': 'f16_f16', 'args': '-ctk f16 -ctv f16'}])
-        
-        # MLA/attention variants (default: none)
-        mla_variants = param_sweep.get('mla_variants', [{'name': 'baseline', 'args': ''}])
-        
-        # Batch size variants (default: standard)
-        batch_variants = param_sweep.get('batch_sizes', [{'name': 'standard', 'args': '-b 2048 -ub 512'}])
+        test_configs = self._checked_test_configs()
+        parsed_metrics = self._parse_metrics()
+        kv_variants, mla_variants, batch_variants = self._sweep_variants()
         
         # Generate cross-product
         for build in builds:
             for test_config in test_configs:
-                pinning = {
-                    'numactl': test_config.get('numactl'),
-                    'llama_numa': test_config.get('llama_numa')
-                }
+                pinning = self._build_pinning(test_config)
                 config_name = test_config['name']
                 
                 for metric in parsed_metrics:
@@ -493,23 +1240,19 @@ class BenchmarkOrchestrator:
                                 variant_name = f"{config_name}_{kv['name']}_{mla['name']}_{batch['name']}"
                                 combined_args = f"{test_config.get('extra_args', '')} {kv['args']} {mla['args']} {batch['args']}".strip()
                                 
-                                test_case = {
+                                yield {
                                     'build': build,
                                     'pinning': (variant_name, pinning),
                                     'metric': metric,
                                     'env': test_config.get('env', {}),
                                     'extra_args': combined_args
                                 }
-                                matrix.append(test_case)
-        
-        return matrix
     
     def run_all(self):
         """Execute the full benchmark suite."""
         print(f"\n🚀 Starting {self.mode.upper()} benchmark run\n")
         
-        matrix = self.generate_test_matrix()
-        total_tests = len(matrix)
+        total_tests = self.count_test_matrix()
         
         # Handle both 'repetitions' as int or dict
         if isinstance(self.config.get('repetitions'), int):
@@ -519,60 +1262,102 @@ class BenchmarkOrchestrator:
         
         print(f"📋 Test matrix: {total_tests} unique configs × {reps} reps = {total_tests * reps} runs\n")
         
-        runner = BenchmarkRunner(self.config, self.report_dir)
+        runner = BenchmarkRunner(self.config, self.report_dir, cpu_affinity=self.bench_cpus)
+        fuse_reps = self.config.get('fuse_outer_reps', True)
         
-        for idx, test in enumerate(matrix, 1):
-            print(f"\n[{idx}/{total_tests}] {test['build']['name']} / {test['pinning'][0]} / {test['metric']['name']}")
-            
-            # Collect provenance once per build/pinning combo
-            provenance = ProvenanceCollector.collect_all(
-                test['build']['binary'],
-                test.get('env', {})
-            )
-            
-            # Run repetitions
-            run_results = []
-            for rep in range(1, reps + 1):
-                result = runner.run_single(
+        self._open_results()
+        try:
+            for idx, test in enumerate(self.iter_test_matrix(), 1):
+                print(f"\n[{idx}/{total_tests}] {test['build']['name']} / {test['pinning'][0]} / {test['metric']['name']}")
+                
+                # Collect provenance once per build/env combo
+                provenance_key = self._provenance_key(test['build']['binary'], test.get('env', {}))
+                
+                # Run repetitions - fused into one llama-bench invocation
+                # (one model load) unless independent processes are requested
+                # or the binary has already shown it lacks per-sample data
+                if fuse_reps and reps > 1 and runner.can_fuse(test['build']):
+                    run_reps = runner.run_fused
+                else:
+                    run_reps = runner.run_separately
+                run_results = run_reps(
                     test['build'],
                     test['pinning'][1],
                     test['metric'],
-                    rep,
+                    reps,
                     extra_env=test.get('env', {}),
                     extra_args=test.get('extra_args', '')
                 )
-                if result:
-                    run_results.append(result)
-            
-            if run_results:
-                self.results.append({
-                    'test': test,
-                    'provenance': provenance,
-                    'runs': run_results
-                })
                 
-                # Save incrementally after each test
-                self._save_incremental_results()
+                if run_results:
+                    record = {
+                        'test': test,
+                        'provenance_key': provenance_key,
+                        'runs': run_results
+                    }
+                    
+                    # Save incrementally after each test
+                    self._save_incremental_results(record)
+                    
+                    self.summaries.append({
+                        'test': test,
+                        'tokens_per_sec': [run['performance'].get('tokens_per_sec', 0.0) for run in run_results],
+                        'stddev_ts': [run['performance'].get('stddev_ts', 0.0) for run in run_results]
+                    })
+        finally:
+            # Keep results.json valid JSON even if the run is interrupted
+            self._close_results()
         
-        print(f"\n✅ Completed {len(self.results)}/{total_tests} test cases")
+        print(f"\n✅ Completed {len(self.summaries)}/{total_tests} test cases")
     
-    def _save_incremental_results(self):
-        """Save current results to disk after each test completes."""
-        raw_json = self.report_dir / 'raw' / 'results.json'
-        with open(raw_json, 'w') as f:
-            json.dump(self.results, f, indent=2)
-        
-        # Also regenerate summary markdown incrementally
-        self.generate_summary_markdown()
+    def _provenance_key(self, binary: str, env: Dict[str, str]) -> str:
+        """Return key into provenance.json, collecting only if the binary changed."""
+        st = os.stat(binary)
+        cache_key = (binary, st.st_mtime_ns, st.st_size, frozenset(env.items()))
+        if cache_key not in self._prov_cache:
+            provenance = ProvenanceCollector.collect_all(binary, env)
+            # Path is part of the key: byte-identical executables in different
+            # build dirs can still resolve different libs via $ORIGIN RUNPATH
+            context_hash = hashlib.blake2b(
+                repr((binary, sorted(env.items()))).encode(),
+                digest_size=4
+            ).hexdigest()
+            key = f"{provenance['binary']['fingerprint']['digest'][:8]}-{context_hash}"
+            
+            self.provenance_index[key] = provenance
+            self._prov_cache[cache_key] = key
+            self._save_provenance_index()
+        return self._prov_cache[cache_key]
+    
+    def _save_provenance_index(self):
+        """Write all provenance snapshots seen so far, keyed by provenance_key."""
+        _dump_json(self.provenance_index, self.report_dir / 'provenance.json')
+    
+    def _open_results(self):
+        """Start the streamed raw/results.json array."""
+        self._results_fp = open(self.report_dir / 'raw' / 'results.json', 'w')
+        self._results_fp.write('[')
+        self._first_record = True
+    
+    def _save_incremental_results(self, record: Dict[str, Any]):
+        """Append one completed test case to the streamed raw/results.json."""
+        self._results_fp.write('\n' if self._first_record else ',\n')
+        self._first_record = False
+        self._results_fp.write(_dumps_json(record))
+        self._results_fp.flush()
+    
+    def _close_results(self):
+        """Terminate the results.json array (safe to call more than once)."""
+        if self._results_fp is not None and not self._results_fp.closed:
+            self._results_fp.write('\n]\n')
+            self._results_fp.close()
     
     def generate_reports(self):
         """Generate summary reports and promote file."""
         print(f"\n📝 Generating reports...")
         
-        # Save raw results as JSON
-        raw_json = self.report_dir / 'raw' / 'results.json'
-        with open(raw_json, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        # Raw results were streamed to results.json as tests completed
+        self._close_results()
         
         # Generate markdown summary
         self.generate_summary_markdown()
@@ -608,47 +1393,44 @@ class BenchmarkOrchestrator:
             
             # Group results by metric
             by_metric = {}
-            for result in self.results:
-                metric_name = result['test']['metric']['name']
+            for summary in self.summaries:
+                metric_name = summary['test']['metric']['name']
                 if metric_name not in by_metric:
                     by_metric[metric_name] = []
-                by_metric[metric_name].append(result)
+                by_metric[metric_name].append(summary)
             
-            for metric_name, results in by_metric.items():
+            for metric_name, summaries in by_metric.items():
                 f.write(f"## {metric_name.upper()}\n\n")
                 
                 # Build table
                 rows = []
-                for r in results:
+                for r in summaries:
                     test = r['test']
-                    runs = r['runs']
-                    
-                    if not runs:
-                        continue
                     
-                    # Calculate stats across our repetitions
-                    perfs = [run['performance'].get('tokens_per_sec', 0) for run in runs]
-                    avg_perf = sum(perfs) / len(perfs) if perfs else 0
-                    stddev_perf = (sum((p - avg_perf) ** 2 for p in perfs) / len(perfs)) ** 0.5 if len(perfs) > 1 else 0
+                    # Calculate stats across our repetitions (sample stddev, N-1)
+                    perfs = np.asarray(r['tokens_per_sec'], dtype=np.float64)
+                    avg_perf = float(perfs.mean())
+                    stddev_perf = float(perfs.std(ddof=1)) if len(perfs) > 1 else 0.0
                     
                     # Also get llama-bench's internal variance (average across our reps)
-                    internal_stddevs = [run['performance'].get('stddev_ts', 0) for run in runs]
-                    avg_internal_stddev = sum(internal_stddevs) / len(internal_stddevs) if internal_stddevs else 0
+                    avg_internal_stddev = float(np.asarray(r['stddev_ts'], dtype=np.float64).mean())
                     
+                    # Leading avg_perf is the sort key, dropped before rendering
                     row = [
+                        avg_perf,
                         test['build']['name'],
                         test['pinning'][0],
                         f"{avg_perf:.2f} ± {stddev_perf:.2f}",
                         f"±{avg_internal_stddev:.2f}",
-                        len(runs)
+                        len(perfs)
                     ]
                     rows.append(row)
                 
-                # Sort by performance (extract first number from "X.XX ± Y.YY")
-                rows.sort(key=lambda x: float(x[2].split()[0]), reverse=True)
+                # Sort by performance
+                rows.sort(key=operator.itemgetter(0), reverse=True)
                 
                 headers = ['Build', 'Config', 't/s (our reps)', 'llama-bench σ', 'Reps']
-                f.write(tabulate(rows, headers=headers, tablefmt='pipe'))
+                f.write(tabulate([row[1:] for row in rows], headers=headers, tablefmt='pipe'))
                 f.write("\n\n")
                 f.write("*Note: 't/s (our reps)' shows variance across our repetitions. 'llama-bench σ' shows llama-bench's internal variance (default 5 reps each).*\n\n")
             
@@ -667,16 +1449,14 @@ class BenchmarkOrchestrator:
         
         # Find top performers per metric
         by_metric = {}
-        for result in self.results:
-            metric_name = result['test']['metric']['name']
+        for summary in self.summaries:
+            metric_name = summary['test']['metric']['name']
             if metric_name not in by_metric:
                 by_metric[metric_name] = []
             
-            runs = result['runs']
-            if runs:
-                perfs = [run['performance'].get('tokens_per_sec', 0) for run in runs]
-                avg_perf = sum(perfs) / len(perfs) if perfs else 0
-                by_metric[metric_name].append((avg_perf, result))
+            perfs = summary['tokens_per_sec']
+            avg_perf = sum(perfs) / len(perfs) if perfs else 0
+            by_metric[metric_name].append((avg_perf, summary))
         
         # Get top N per metric
         winners = []
@@ -731,7 +1511,7 @@ class BenchmarkOrchestrator:
             config_name = test['pinning'][0]
             if config_name not in seen_configs:
                 # Find the original test_matrix entry to preserve all details
-                original_matrix = self.config.get('test_matrix', [])
+                original_matrix = self.get_test_configs()
                 matching_config = next((cfg for cfg in original_matrix if cfg['name'] == config_name), None)
                 
                 if matching_config:
@@ -752,6 +1532,7 @@ def main():
     parser.add_argument(
         'config',
         type=Path,
+        nargs='?',
         help='Path to YAML config file'
     )
     parser.add_argument(
@@ -759,9 +1540,26 @@ def main():
         action='store_true',
         help='Show test matrix without running'
     )
+    parser.add_argument(
+        '--repair-results',
+        type=Path,
+        metavar='RESULTS_JSON',
+        help='Close the array in a results.json left truncated by a killed run, then exit'
+    )
     
     args = parser.parse_args()
     
+    if args.repair_results:
+        if not args.repair_results.exists():
+            print(f"❌ Results file not found: {args.repair_results}")
+            sys.exit(1)
+        kept = _repair_results_json(args.repair_results)
+        print(f"✓ {args.repair_results}: {kept} complete test cases kept")
+        sys.exit(0)
+    
+    if args.config is None:
+        parser.error("the following arguments are required: config")
+    
     if not args.config.exists():
         print(f"❌ Config file not found: {args.config}")
         sys.exit(1)
@@ -769,13 +1567,15 @@ def main():
     orchestrator = BenchmarkOrchestrator(args.config)
     
     if args.dry_run:
-        matrix = orchestrator.generate_test_matrix()
-        print(f"\n📋 Test Matrix ({len(matrix)} configs):\n")
-        for idx, test in enumerate(matrix, 1):
+        print(f"\n📋 Test Matrix ({orchestrator.count_test_matrix()} configs):\n")
+        for idx, test in enumerate(orchestrator.iter_test_matrix(), 1):
             print(f"{idx}. {test['build']['name']} / {test['pinning'][0]} / {test['metric']['name']}")
         sys.exit(0)
     
-    orchestrator.run_all()
+    try:
+        orchestrator.run_all()
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted - writing reports for completed test cases")
     orchestrator.generate_reports()
     
     print(f"\n🎉 All done! Check {orchestrator.report_dir}/summary.md")